@@ -0,0 +1,96 @@
+"""
+Audio Deepfake Detection - Request Batching
+
+Collects concurrent /api/audio/predict requests and classifies them
+together in one worker call; clips of equal length share a forward pass.
+Separate uploads rarely decode to the same sample count, so batching only
+helps identical-length clips and by default no time is spent waiting for one.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from audio_predict import predict_audio_batch, AUDIO_BATCH_SIZE
+from batching import collect_batch
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of uploads per pipeline call and how long to wait for more.
+# The wait defaults to 0: requests queued behind a running batch are still
+# grouped, but no request is delayed for a batch that would rarely form
+AUDIO_MAX_BATCH = int(os.getenv("AUDIO_MAX_BATCH", str(AUDIO_BATCH_SIZE)))
+AUDIO_BATCH_WAIT = float(os.getenv("AUDIO_BATCH_WAIT_MS", "0")) / 1000
+
+
+class AudioBatcher:
+    """
+    Micro-batcher for audio predictions.
+    
+    A background task drains up to ``max_batch`` requests, those already
+    queued plus whatever arrives within ``max_wait`` seconds, runs them through
+    ``predict_audio_batch`` (which only batches waveforms of equal length,
+    since padding changes this model's scores) and resolves each request's
+    future with its own result or error.
+    """
+    
+    def __init__(self, max_batch: int = AUDIO_MAX_BATCH, max_wait: float = AUDIO_BATCH_WAIT):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+    
+    async def submit(
+        self,
+        audio: bytes,
+        content_type: Optional[str] = None,
+        filename: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue uploaded audio for prediction and wait for the result.
+        
+        Args:
+            audio: Uploaded file's bytes
+            content_type: Optional MIME type from upload
+            filename: Optional original file name
+        
+        Returns:
+            Result dictionary, same as audio_predict.predict_audio
+        
+        Raises:
+            AudioValidationError, AudioLoadError, AudioPredictionError: As raised
+                by predict_audio for this file
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._worker_task = asyncio.create_task(self._worker())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio, content_type, filename, future))
+        return await future
+    
+    async def _worker(self) -> None:
+        """Drain the queue in batches."""
+        while True:
+            batch = await collect_batch(self._queue, self.max_batch, self.max_wait)
+            
+            logger.info("Running audio batch of %s request(s)", len(batch))
+            
+            try:
+                # Decoding and inference run off the event loop
+                results = await asyncio.to_thread(
+                    predict_audio_batch,
+                    [(audio, content_type, filename) for audio, content_type, filename, _ in batch]
+                )
+            except Exception as e:
+                results = [e] * len(batch)
+            
+            # Hand each result back to the request that is waiting for it
+            for (_, _, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
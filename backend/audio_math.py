@@ -0,0 +1,53 @@
+"""
+Audio Deepfake Detection - Score Math
+
+Temperature scaling of the real/fake probabilities, compiled to machine
+code with numba when it is installed (plain Python otherwise).
+"""
+
+import math
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to the interpreted version
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True, fastmath=True)
+def scale(real: float, fake: float, temperature: float):
+    """
+    Apply temperature scaling to a pair of real/fake probabilities.
+    
+    Probabilities are converted to log space, divided by the temperature and
+    passed through a numerically stable softmax. Higher temperature gives
+    softer, more human-friendly confidence scores.
+    
+    Args:
+        real: Probability of the "real" label
+        fake: Probability of the "fake" label
+        temperature: 1.0 = no change, higher = softer
+    
+    Returns:
+        Tuple of (scaled_real, scaled_fake, top_index, confidence)
+        top_index: 0 for REAL, 1 for FAKE
+        confidence: Scaled probability of the top label (0-100)
+    """
+    # Clamp to avoid log(0), then scale the logits by temperature
+    real_logit = math.log(min(max(real, 1e-7), 1.0 - 1e-7)) / temperature
+    fake_logit = math.log(min(max(fake, 1e-7), 1.0 - 1e-7)) / temperature
+    
+    # Softmax to get calibrated probabilities
+    max_logit = max(real_logit, fake_logit)
+    real_exp = math.exp(real_logit - max_logit)
+    fake_exp = math.exp(fake_logit - max_logit)
+    total = real_exp + fake_exp
+    scaled_real = real_exp / total
+    scaled_fake = fake_exp / total
+    
+    # Scaling is monotonic, so the ranking of the labels is unchanged
+    if scaled_real > scaled_fake:
+        return scaled_real, scaled_fake, 0, scaled_real * 100.0
+    return scaled_real, scaled_fake, 1, scaled_fake * 100.0
@@ -7,19 +7,27 @@ Returns predictions in the format expected by the API.
 This module is completely separate from the video prediction logic.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple, Union
 import logging
+import os
 
-from audio_model_utils import load_audio_pipeline, get_audio_model_info, AUDIO_MODEL_ID
+import numpy as np
+import torch
+
+from audio_math import scale
+from audio_model_utils import (
+    load_audio_pipeline,
+    get_audio_model_info,
+    is_audio_pipeline_loaded,
+    AUDIO_MODEL_ID
+)
 from audio_preprocessing import (
     preprocess_audio,
-    cleanup_temp_wav,
+    REQUIRED_SAMPLE_RATE,
     AudioValidationError,
     AudioLoadError
 )
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -28,13 +36,61 @@ class AudioPredictionError(Exception):
     pass
 
 
-def predict_audio(file_path: str, content_type: str = None) -> Dict[str, Any]:
+# Batch size used when several uploads are classified in one pipeline call
+AUDIO_BATCH_SIZE = int(os.getenv("AUDIO_BATCH_SIZE", "8"))
+
+# Temperature for softening the model's probabilities (1.0 = no change, higher = softer)
+TEMPERATURE = float(os.getenv("AUDIO_TEMPERATURE", "3.0"))
+
+
+def _build_result(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert raw pipeline scores into the API response format.
+    
+    Args:
+        results: Pipeline output for one file: [{"label": "fake", "score": 0.12}, ...]
+        
+    Returns:
+        Dictionary with prediction, confidence, model and all_scores
+    """
+    logger.debug("Raw prediction results: %s", results)
+    
+    raw_scores = {item["label"]: item["score"] for item in results}
+    scaled_real, scaled_fake, top_index, confidence = scale(
+        raw_scores.get("real", 0.5), raw_scores.get("fake", 0.5), TEMPERATURE
+    )
+    
+    logger.debug("Temperature-scaled scores: real=%.4f, fake=%.4f", scaled_real, scaled_fake)
+    
+    prediction_label = "REAL" if top_index == 0 else "FAKE"
+    
+    result = {
+        "prediction": prediction_label,
+        "confidence": round(confidence, 2),
+        "model": AUDIO_MODEL_ID,
+        "all_scores": {
+            "real": round(scaled_real * 100, 2),
+            "fake": round(scaled_fake * 100, 2)
+        }
+    }
+    
+    logger.info("Prediction complete: %s (%.1f%%)", prediction_label, confidence)
+    
+    return result
+
+
+def predict_audio(
+    audio: Union[str, bytes],
+    content_type: str = None,
+    filename: str = None
+) -> Dict[str, Any]:
     """
     Predict whether an audio file is real or fake.
     
     Args:
-        file_path: Path to the audio file
+        audio: Path to the audio file, or the uploaded file's bytes
         content_type: Optional MIME type from upload
+        filename: Optional original file name (needed for bytes input)
         
     Returns:
         Dictionary with prediction results:
@@ -50,87 +106,111 @@ def predict_audio(file_path: str, content_type: str = None) -> Dict[str, Any]:
         AudioLoadError: If audio loading fails
         AudioPredictionError: If inference fails
     """
-    wav_path = None
-    try:
-        # Preprocess and validate audio (converts to WAV if needed)
-        logger.info(f"Starting audio prediction for: {file_path}")
-        wav_path = preprocess_audio(file_path, content_type)
+    result = predict_audio_batch([(audio, content_type, filename)])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def predict_audio_batch(
+    items: List[Tuple[Union[str, bytes], Optional[str], Optional[str]]]
+) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Predict several audio files with a single pipeline call.
+    
+    Each file is validated and decoded on its own, then files whose decoded
+    waveforms have the same length are classified together so the pipeline
+    can batch the Wav2Vec2 forward passes without padding. Errors are
+    returned per item instead of failing the whole batch.
+    
+    Args:
+        items: List of (audio, content_type, filename) tuples, where audio
+            is a file path or the uploaded bytes
         
+    Returns:
+        List aligned with ``items``; each entry is either a result dictionary
+        (see ``predict_audio``) or the exception raised for that file
+    """
+    outputs: List[Union[Dict[str, Any], Exception]] = [None] * len(items)
+    audio_inputs = {}
+    
+    # Preprocess and validate each audio file (decoded to a 16kHz array)
+    for index, (audio, content_type, filename) in enumerate(items):
+        try:
+            logger.info("Starting audio prediction for: %s", audio if isinstance(audio, str) else filename)
+            audio_inputs[index] = preprocess_audio(audio, content_type, filename)
+        except (AudioValidationError, AudioLoadError) as e:
+            # Validation/load errors are reported as-is
+            outputs[index] = e
+        except Exception as e:
+            logger.error("Audio prediction failed: %s", e)
+            outputs[index] = AudioPredictionError(f"Prediction failed: {e}")
+    
+    if not audio_inputs:
+        return outputs
+    
+    # Only waveforms of equal length are batched together: the pipeline
+    # zero-pads to the longest input without an attention mask, and the
+    # classifier pools over the padding, so mixed lengths change the scores
+    buckets: Dict[int, List[int]] = {}
+    for index, audio_input in audio_inputs.items():
+        buckets.setdefault(len(audio_input["raw"]), []).append(index)
+    
+    try:
         # Load the classification pipeline
         pipeline = load_audio_pipeline()
-        
-        # Run inference
-        # The pipeline returns a list of dicts: [{"label": "fake", "score": 0.12}, ...]
-        logger.info("Running audio classification...")
-        results = pipeline(wav_path)
-        
-        logger.info(f"Raw prediction results: {results}")
-        
-        # Apply temperature scaling to soften extreme probabilities
-        # This makes the confidence scores more human-friendly
-        # Higher temperature = softer probabilities
-        TEMPERATURE = 3.0  # Adjust this value: 1.0 = no change, higher = softer
-        
-        import math
-        raw_scores = {item["label"]: item["score"] for item in results}
-        
-        # Convert probabilities to logits, apply temperature, then back to probabilities
-        # Using log-odds transformation for binary classification
-        real_score = raw_scores.get("real", 0.5)
-        fake_score = raw_scores.get("fake", 0.5)
-        
-        # Clamp to avoid log(0)
-        real_score = max(min(real_score, 0.9999999), 0.0000001)
-        fake_score = max(min(fake_score, 0.9999999), 0.0000001)
-        
-        # Apply temperature scaling via softmax
-        real_logit = math.log(real_score)
-        fake_logit = math.log(fake_score)
-        
-        # Scale by temperature
-        real_scaled = real_logit / TEMPERATURE
-        fake_scaled = fake_logit / TEMPERATURE
-        
-        # Softmax to get calibrated probabilities
-        max_logit = max(real_scaled, fake_scaled)
-        real_exp = math.exp(real_scaled - max_logit)
-        fake_exp = math.exp(fake_scaled - max_logit)
-        total = real_exp + fake_exp
-        
-        scaled_real = real_exp / total
-        scaled_fake = fake_exp / total
-        
-        logger.info(f"Temperature-scaled scores: real={scaled_real:.4f}, fake={scaled_fake:.4f}")
-        
-        # Get top prediction (use original for decision, scaled for display)
-        top_label = "real" if real_score > fake_score else "fake"
-        prediction_label = top_label.upper()
-        confidence = (scaled_real if top_label == "real" else scaled_fake) * 100
-        
-        result = {
-            "prediction": prediction_label,
-            "confidence": round(confidence, 2),
-            "model": AUDIO_MODEL_ID,
-            "all_scores": {
-                "real": round(scaled_real * 100, 2),
-                "fake": round(scaled_fake * 100, 2)
-            }
-        }
-        
-        logger.info(f"Prediction complete: {prediction_label} ({confidence:.1f}%)")
-        
-        return result
-        
-    except (AudioValidationError, AudioLoadError):
-        # Re-raise validation/load errors as-is
-        raise
     except Exception as e:
-        logger.error(f"Audio prediction failed: {e}")
-        raise AudioPredictionError(f"Prediction failed: {e}")
-    finally:
-        # Clean up temporary WAV file if one was created
-        if wav_path and wav_path != file_path:
-            cleanup_temp_wav(file_path, wav_path)
+        logger.error("Audio prediction failed: %s", e)
+        for index in audio_inputs:
+            outputs[index] = AudioPredictionError(f"Prediction failed: {e}")
+        return outputs
+    
+    logger.info("Running audio classification on %s file(s) in %s group(s)...", len(audio_inputs), len(buckets))
+    
+    for indices in buckets.values():
+        try:
+            # The pipeline returns one list of dicts per input: [{"label": "fake", "score": 0.12}, ...]
+            # num_workers=0 keeps decoding in-process (DataLoader workers slow down CPU inference)
+            # inference_mode is cheaper than the pipeline's own no_grad context
+            with torch.inference_mode():
+                batch_results = pipeline(
+                    [audio_inputs[index] for index in indices],
+                    batch_size=AUDIO_BATCH_SIZE,
+                    num_workers=0
+                )
+            
+            for index, results in zip(indices, batch_results):
+                outputs[index] = _build_result(results)
+        except Exception as e:
+            logger.error("Audio prediction failed: %s", e)
+            for index in indices:
+                outputs[index] = AudioPredictionError(f"Prediction failed: {e}")
+    
+    return outputs
+
+
+def warmup_audio_pipeline() -> None:
+    """
+    Load the audio pipeline and run one inference on a second of silence.
+    
+    The first forward pass pays for lazy kernel selection and memory
+    allocation, and the first call of the score math pays for its numba
+    compilation, so doing both at startup keeps that cost out of the first
+    user request.
+    
+    Raises:
+        RuntimeError: If the pipeline cannot be loaded
+    """
+    # Trigger numba compilation of the score math
+    scale(0.5, 0.5, TEMPERATURE)
+    
+    pipeline = load_audio_pipeline()
+    silence = np.zeros(REQUIRED_SAMPLE_RATE, dtype=np.float32)
+    
+    with torch.inference_mode():
+        pipeline({"raw": silence, "sampling_rate": REQUIRED_SAMPLE_RATE})
+    
+    logger.info("Audio pipeline warmed up")
 
 
 def get_model_status() -> Dict[str, Any]:
@@ -140,8 +220,6 @@ def get_model_status() -> Dict[str, Any]:
     Returns:
         Dictionary with model info and status
     """
-    from audio_model_utils import is_audio_pipeline_loaded
-    
     info = get_audio_model_info()
     info["loaded"] = is_audio_pipeline_loaded()
     
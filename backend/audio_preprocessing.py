@@ -2,24 +2,36 @@
 Audio Deepfake Detection - Preprocessing Utilities
 
 Handles audio file loading, validation, and preprocessing.
-Converts non-WAV formats to WAV using ffmpeg for compatibility
-with the HuggingFace pipeline.
+Decodes uploads (paths or in-memory bytes) into a 16kHz mono array for
+the HuggingFace pipeline, using soundfile or PyAV in-process (ffmpeg CLI
+as a fallback).
 
 This module is completely separate from the video preprocessing.py.
 """
 
+import io
 import os
 import subprocess
-import tempfile
-from typing import Optional
+from typing import Optional, Dict, Any, BinaryIO, Union
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+import librosa
+import numpy as np
+import soundfile as sf
+
+try:
+    import av
+except ImportError:  # PyAV is optional; ffmpeg subprocess is used instead
+    av = None
+
 logger = logging.getLogger(__name__)
 
 # Audio configuration
 REQUIRED_SAMPLE_RATE = 16000  # Wav2Vec2 requires 16kHz
+MAX_AUDIO_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+
+# Audio can be decoded from a path or from an in-memory file object
+AudioSource = Union[str, BinaryIO]
 
 # Supported audio formats
 SUPPORTED_EXTENSIONS = {'.wav', '.mp3', '.flac', '.m4a', '.ogg', '.wma', '.aac'}
@@ -33,6 +45,9 @@ SUPPORTED_MIME_TYPES = {
     'audio/aac'
 }
 
+# Formats that soundfile can read directly (others are decoded by PyAV/ffmpeg)
+SOUNDFILE_EXTENSIONS = {'.wav', '.flac', '.ogg'}
+
 
 class AudioValidationError(Exception):
     """Raised when audio validation fails."""
@@ -44,30 +59,26 @@ class AudioLoadError(Exception):
     pass
 
 
-def validate_audio_file(file_path: str, content_type: Optional[str] = None) -> None:
+def _validate_audio_metadata(file_size: int, filename: str, content_type: Optional[str]) -> None:
     """
-    Validate an audio file before processing.
+    Validate size, extension and MIME type of an audio upload.
     
     Args:
-        file_path: Path to the audio file
+        file_size: Size of the audio data in bytes
+        filename: File name or path (used for the extension check)
         content_type: Optional MIME type from upload
         
     Raises:
         AudioValidationError: If validation fails
     """
-    # Check file exists
-    if not os.path.exists(file_path):
-        raise AudioValidationError("Audio file not found")
-    
     # Check file size (max 50MB)
-    file_size = os.path.getsize(file_path)
     if file_size == 0:
         raise AudioValidationError("Audio file is empty")
-    if file_size > 50 * 1024 * 1024:  # 50MB
+    if file_size > MAX_AUDIO_FILE_SIZE:
         raise AudioValidationError("Audio file too large (max 50MB)")
     
     # Check extension
-    _, ext = os.path.splitext(file_path)
+    _, ext = os.path.splitext(filename)
     ext = ext.lower()
     if ext and ext not in SUPPORTED_EXTENSIONS:
         raise AudioValidationError(
@@ -83,65 +94,144 @@ def validate_audio_file(file_path: str, content_type: Optional[str] = None) -> N
             raise AudioValidationError(
                 f"Invalid content type: {content_type}. Must be an audio file."
             )
+
+
+def validate_audio_file(file_path: str, content_type: Optional[str] = None) -> None:
+    """
+    Validate an audio file before processing.
+    
+    Args:
+        file_path: Path to the audio file
+        content_type: Optional MIME type from upload
+        
+    Raises:
+        AudioValidationError: If validation fails
+    """
+    # Check file exists
+    if not os.path.exists(file_path):
+        raise AudioValidationError("Audio file not found")
+    
+    file_size = os.path.getsize(file_path)
+    _validate_audio_metadata(file_size, file_path, content_type)
+    
+    logger.info("Audio file validated: %s (%s bytes)", file_path, file_size)
+
+
+def validate_audio_bytes(data: bytes, filename: Optional[str] = None, content_type: Optional[str] = None) -> None:
+    """
+    Validate uploaded audio data held in memory.
     
-    logger.info(f"Audio file validated: {file_path} ({file_size} bytes)")
+    Args:
+        data: Raw bytes of the uploaded file
+        filename: Optional original file name (used for the extension check)
+        content_type: Optional MIME type from upload
+        
+    Raises:
+        AudioValidationError: If validation fails
+    """
+    _validate_audio_metadata(len(data), filename or "", content_type)
+    
+    logger.info("Audio upload validated: %s (%s bytes)", filename, len(data))
 
 
-def convert_to_wav(input_path: str) -> str:
+def decode_with_pyav(source: AudioSource) -> np.ndarray:
     """
-    Convert audio file to WAV format using ffmpeg.
+    Decode audio in-process with PyAV into a 16kHz mono float32 array.
     
-    The HuggingFace pipeline uses soundfile internally, which only supports
-    WAV, FLAC, OGG. For other formats (MP3, M4A, AAC), we need to convert.
+    PyAV links the FFmpeg libraries directly, so there is no ffmpeg process
+    to fork and exec for each upload.
     
     Args:
-        input_path: Path to the input audio file
+        source: Path or binary file-like object
         
     Returns:
-        Path to the WAV file (either original or converted)
+        Audio samples as a 1-D float32 array at 16kHz
         
     Raises:
-        AudioLoadError: If conversion fails
+        AudioLoadError: If decoding fails
     """
-    _, ext = os.path.splitext(input_path)
-    ext = ext.lower()
+    try:
+        with av.open(source) as container:
+            if not container.streams.audio:
+                raise AudioLoadError("File contains no audio stream")
+            
+            # Demux, decode and resample to 16kHz mono float32 in one pass
+            resampler = av.AudioResampler(format='flt', layout='mono', rate=REQUIRED_SAMPLE_RATE)
+            chunks = []
+            for frame in container.decode(container.streams.audio[0]):
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            
+            # Flush samples buffered in the resampler
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+        
+        if not chunks:
+            raise AudioLoadError("Audio file contains no samples")
+        
+        return np.concatenate(chunks)
+        
+    except AudioLoadError:
+        raise
+    except Exception as e:
+        raise AudioLoadError(f"Failed to decode audio: {e}")
+
+
+def decode_with_ffmpeg(source: AudioSource) -> np.ndarray:
+    """
+    Decode audio with ffmpeg into a 16kHz mono float32 array.
     
-    # Formats that soundfile can read directly
-    if ext in {'.wav', '.flac', '.ogg'}:
-        logger.info(f"File format {ext} is directly supported, no conversion needed")
-        return input_path
+    Fallback for formats soundfile cannot read (MP3, M4A, AAC, WMA) when
+    PyAV is not installed. File-like sources are fed to ffmpeg on stdin and
+    raw float32 samples are read back from stdout, so nothing is written
+    to disk.
     
-    # Need to convert to WAV
-    logger.info(f"Converting {ext} to WAV using ffmpeg...")
+    Args:
+        source: Path or binary file-like object
+        
+    Returns:
+        Audio samples as a 1-D float32 array at 16kHz
+        
+    Raises:
+        AudioLoadError: If decoding fails
+    """
+    if isinstance(source, str):
+        input_arg, input_data = source, None
+    else:
+        input_arg, input_data = 'pipe:0', source.read()
     
-    # Create temp file for WAV output
-    temp_wav = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-    temp_wav.close()
-    output_path = temp_wav.name
+    logger.info("Decoding audio with ffmpeg...")
     
     try:
-        # Use ffmpeg to convert to WAV (16kHz, mono, PCM)
+        # Decode to raw PCM (16kHz, mono, float32 little-endian) on stdout
         result = subprocess.run(
             [
-                'ffmpeg', '-y',  # Overwrite output
-                '-i', input_path,  # Input file
+                'ffmpeg',
+                '-i', input_arg,  # Input file or stdin
                 '-ar', str(REQUIRED_SAMPLE_RATE),  # Sample rate 16kHz
                 '-ac', '1',  # Mono
-                '-c:a', 'pcm_s16le',  # PCM 16-bit signed little-endian
-                output_path
+                '-f', 'f32le',  # Raw float32 little-endian
+                'pipe:1'
             ],
+            input=input_data,
+            stdin=subprocess.DEVNULL if input_data is None else None,
             capture_output=True,
-            text=True,
             timeout=60
         )
         
         if result.returncode != 0:
-            logger.error(f"ffmpeg conversion failed: {result.stderr}")
-            raise AudioLoadError(f"Failed to convert audio: {result.stderr[:200]}")
+            stderr = result.stderr.decode('utf-8', errors='replace')
+            logger.error("ffmpeg decoding failed: %s", stderr)
+            raise AudioLoadError(f"Failed to convert audio: {stderr[:200]}")
+        
+        data = np.frombuffer(result.stdout, dtype=np.float32)
+        if data.size == 0:
+            raise AudioLoadError("Audio file contains no samples")
         
-        logger.info(f"Audio converted to WAV: {output_path}")
-        return output_path
+        return data
         
+    except AudioLoadError:
+        raise
     except subprocess.TimeoutExpired:
         raise AudioLoadError("Audio conversion timed out")
     except FileNotFoundError:
@@ -150,48 +240,106 @@ def convert_to_wav(input_path: str) -> str:
         raise AudioLoadError(f"Audio conversion failed: {e}")
 
 
-def preprocess_audio(file_path: str, content_type: Optional[str] = None) -> str:
+def load_audio(source: AudioSource) -> np.ndarray:
     """
-    Preprocessing pipeline for audio files.
-    
-    This validates the file, converts to WAV if needed, and returns
-    the path for the HuggingFace pipeline to process.
+    Decode a WAV, FLAC or OGG file with soundfile into a 16kHz mono float32 array.
     
     Args:
-        file_path: Path to uploaded audio file
-        content_type: Optional MIME type from upload
+        source: Path or binary file-like object
         
     Returns:
-        Path to the processed audio file (WAV format)
+        Audio samples as a 1-D float32 array at 16kHz
         
     Raises:
-        AudioValidationError: If validation fails
-        AudioLoadError: If conversion fails
+        AudioLoadError: If the file cannot be decoded
     """
-    # Validate file metadata
-    validate_audio_file(file_path, content_type)
+    try:
+        data, sample_rate = sf.read(source, dtype='float32', always_2d=False)
+    except Exception as e:
+        raise AudioLoadError(f"Failed to read audio: {e}")
+    
+    if data.size == 0:
+        raise AudioLoadError("Audio file contains no samples")
+    
+    # Downmix to mono
+    if data.ndim > 1:
+        data = data.mean(axis=1)
     
-    # Convert to WAV if needed (for soundfile compatibility)
-    wav_path = convert_to_wav(file_path)
+    # Resample to the rate Wav2Vec2 expects
+    if sample_rate != REQUIRED_SAMPLE_RATE:
+        logger.info("Resampling audio from %sHz to %sHz", sample_rate, REQUIRED_SAMPLE_RATE)
+        data = librosa.resample(data, orig_sr=sample_rate, target_sr=REQUIRED_SAMPLE_RATE)
     
-    logger.info(f"Audio file ready for inference: {wav_path}")
-    return wav_path
+    return np.ascontiguousarray(data, dtype=np.float32)
 
 
-def cleanup_temp_wav(original_path: str, wav_path: str) -> None:
+def decode_to_array(source: AudioSource, filename: Optional[str] = None) -> np.ndarray:
     """
-    Clean up temporary WAV file if it was created during conversion.
+    Decode audio from a path or file-like object into a 16kHz mono float32 array.
+    
+    Tries soundfile first for WAV/FLAC/OGG names and falls back to PyAV (or
+    the ffmpeg CLI), which probe the actual content. The extension is only a
+    hint: non-PCM WAVs, mislabeled files and nameless uploads still decode.
+    Everything happens in memory.
     
     Args:
-        original_path: Original input file path
-        wav_path: WAV file path (may be same as original)
+        source: Path or binary file-like object
+        filename: File name used to pick the first decoder (defaults to the path)
+        
+    Returns:
+        Audio samples as a 1-D float32 array at 16kHz
+        
+    Raises:
+        AudioLoadError: If decoding fails
     """
-    if wav_path != original_path and os.path.exists(wav_path):
+    if filename is None and isinstance(source, str):
+        filename = source
+    _, ext = os.path.splitext(filename or "")
+    
+    if ext.lower() in SOUNDFILE_EXTENSIONS:
         try:
-            os.unlink(wav_path)
-            logger.info(f"Cleaned up temporary WAV file: {wav_path}")
-        except Exception as e:
-            logger.warning(f"Could not delete temporary WAV: {e}")
+            return load_audio(source)
+        except AudioLoadError as e:
+            logger.info("soundfile could not read %s (%s), falling back to ffmpeg", filename, e)
+            if not isinstance(source, str):
+                source.seek(0)
+    if av is not None:
+        return decode_with_pyav(source)
+    return decode_with_ffmpeg(source)
+
+
+def preprocess_audio(
+    audio: Union[str, bytes],
+    content_type: Optional[str] = None,
+    filename: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Preprocessing pipeline for audio files.
+    
+    This validates the upload and decodes it into the array input the
+    HuggingFace pipeline accepts. In-memory uploads never touch the disk.
+    
+    Args:
+        audio: Path to the audio file, or the uploaded file's bytes
+        content_type: Optional MIME type from upload
+        filename: Optional original file name (needed for bytes input)
+        
+    Returns:
+        Pipeline input dictionary: {"raw": np.ndarray, "sampling_rate": 16000}
+        
+    Raises:
+        AudioValidationError: If validation fails
+        AudioLoadError: If decoding fails
+    """
+    if isinstance(audio, str):
+        validate_audio_file(audio, content_type)
+        samples = decode_to_array(audio)
+    else:
+        validate_audio_bytes(audio, filename, content_type)
+        samples = decode_to_array(io.BytesIO(audio), filename)
+    
+    logger.info("Audio ready for inference: %s samples at %sHz", len(samples), REQUIRED_SAMPLE_RATE)
+    return {"raw": samples, "sampling_rate": REQUIRED_SAMPLE_RATE}
 
 
 def get_audio_duration(file_path: str) -> float:
@@ -218,6 +366,6 @@ def get_audio_duration(file_path: str) -> float:
         if result.returncode == 0 and result.stdout.strip():
             return float(result.stdout.strip())
     except Exception as e:
-        logger.warning(f"Could not get audio duration: {e}")
+        logger.warning("Could not get audio duration: %s", e)
     
     return 0.0
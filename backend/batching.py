@@ -0,0 +1,43 @@
+"""
+Request Batching Helpers
+
+Shared by the video and audio micro-batchers.
+"""
+
+import asyncio
+from typing import Any, List
+
+
+async def collect_batch(queue: asyncio.Queue, max_batch: int, max_wait: float) -> List[Any]:
+    """
+    Wait for the next queued item, then keep collecting until the batch is full or the window closes.
+    
+    Items that are already queued are always taken, so with max_wait=0 a
+    batch is whatever piled up while the previous one was running.
+    
+    Args:
+        queue: Queue of pending requests
+        max_batch: Maximum number of items in the batch
+        max_wait: Seconds to wait for more items after the first one arrives
+    
+    Returns:
+        List of between 1 and max_batch queued items, in arrival order
+    """
+    loop = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + max_wait
+    
+    while len(batch) < max_batch:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    
+    return batch
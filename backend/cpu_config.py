@@ -0,0 +1,18 @@
+"""
+CPU sizing shared by the server and the preprocessing thread pools.
+
+Several uvicorn workers (WEB_CONCURRENCY) share the machine, so every
+thread pool is sized from this process's share of the usable cores.
+Must not import torch: server.py reads it before torch is imported.
+"""
+
+import os
+
+# Cores this process may run on (respects the CPU affinity mask / cgroup pinning)
+CPU_COUNT = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+# Number of uvicorn worker processes sharing those cores
+NUM_INSTANCES = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+# Cores available to each worker process
+CPUS_PER_INSTANCE = max(1, CPU_COUNT // NUM_INSTANCES)
@@ -3,7 +3,30 @@ import torch.nn as nn
 from torchvision import models
 import glob
 import os
-from typing import Optional
+import re
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Directory containing the video model checkpoints
+MODELS_DIR = "models"
+
+# Model naming pattern: model_{accuracy}_acc_{frames}_frames_*.pt
+_MODEL_RE = re.compile(r"model_(?P<acc>[\d.]+)_acc_(?P<frames>\d+)_frames")
+
+# Compile loaded models with torch.compile (needs a C++ compiler at runtime on CPU)
+VIDEO_TORCH_COMPILE = os.getenv("VIDEO_TORCH_COMPILE", "0") == "1"
+
+# Run models in FP16 (channels_last) on CUDA to use tensor cores
+VIDEO_HALF_PRECISION = os.getenv("VIDEO_HALF_PRECISION", "1") == "1"
+
+# Run the forward pass under BF16 autocast on CPU (only faster on CPUs with
+# native BF16 support such as AVX512-BF16/AMX, so it is opt-in)
+VIDEO_CPU_BF16 = os.getenv("VIDEO_CPU_BF16", "0") == "1"
+
 
 class Model(nn.Module):
     """
@@ -11,10 +34,10 @@ class Model(nn.Module):
     Ported from reference code for production use.
     """
     
-    def __init__(self, num_classes=2, latent_dim=2048, lstm_layers=1, hidden_dim=2048, bidirectional=False):
+    def __init__(self, num_classes=2, latent_dim=2048, lstm_layers=1, hidden_dim=2048, bidirectional=False, pretrained=True):
         super(Model, self).__init__()
-        # Load pretrained ResNeXt50
-        model = models.resnext50_32x4d(pretrained=True)
+        # Load ResNeXt50 (ImageNet weights are only needed when training from scratch)
+        model = models.resnext50_32x4d(pretrained=pretrained)
         # Remove the last two layers (avgpool and fc)
         self.model = nn.Sequential(*list(model.children())[:-2])
         self.lstm = nn.LSTM(latent_dim, hidden_dim, lstm_layers, bidirectional)
@@ -22,72 +45,187 @@ class Model(nn.Module):
         self.dp = nn.Dropout(0.4)
         self.linear1 = nn.Linear(2048, num_classes)
         self.avgpool = nn.AdaptiveAvgPool2d(1)
+        # Inference-only by default; call .train() explicitly for training
+        self.eval()
 
     def forward(self, x):
         batch_size, seq_length, c, h, w = x.shape
-        x = x.view(batch_size * seq_length, c, h, w)
+        x = x.reshape(batch_size * seq_length, c, h, w)
         fmap = self.model(x)
         x = self.avgpool(fmap)
-        x = x.view(batch_size, seq_length, 2048)
+        # The LSTM is not batch_first, and the checkpoints were trained with
+        # batch size 1: each frame is its own length-1 sequence. Keep that for
+        # batched input by putting every frame of every video on the LSTM's
+        # batch axis, so no hidden state flows from one video into the next
+        x = x.reshape(1, batch_size * seq_length, 2048)
         x_lstm, _ = self.lstm(x, None)
+        x_lstm = x_lstm.reshape(batch_size, seq_length, -1)
         return fmap, self.dp(self.linear1(x_lstm[:, -1, :]))
 
 
-def get_accurate_model(sequence_length: int, models_dir: str = "models") -> Optional[str]:
+def parse_model_filename(filename: str) -> Optional[Tuple[float, int]]:
     """
-    Select the best model based on sequence length (frame count).
+    Parse accuracy and frame count from a model filename.
+    
+    Args:
+        filename: Model file name, e.g. model_97_acc_60_frames_FF_data.pt
+    
+    Returns:
+        Tuple of (accuracy, frames), or None if the name doesn't match
+    """
+    match = _MODEL_RE.match(filename)
+    if not match:
+        return None
+    try:
+        return float(match["acc"]), int(match["frames"])
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4)
+def _scan_models(models_dir: str, mtime: float) -> Tuple[Tuple[str, float, int], ...]:
+    """
+    List the parseable model files in a directory.
+    
+    Cached per directory mtime, so the directory is only rescanned when
+    files are added, removed or renamed.
     
     Args:
-        sequence_length: Number of frames to sample from video (10, 20, 40, 60, 80, 100)
         models_dir: Directory containing the model files
+        mtime: Modification time of the directory (cache key only)
     
     Returns:
-        Full path to the selected model file, or None if no model found
+        Tuple of (path, accuracy, frames) entries
     """
-    model_name = []
-    sequence_model = []
-    final_model = ""
+    models = []
+    for model_path in glob.glob(os.path.join(models_dir, "*.pt")):
+        parsed = parse_model_filename(os.path.basename(model_path))
+        if parsed is None:
+            continue
+        accuracy, frames = parsed
+        models.append((model_path, accuracy, frames))
+    return tuple(models)
+
+
+def list_models(models_dir: str = MODELS_DIR) -> Tuple[Tuple[str, float, int], ...]:
+    """
+    List the model files in a directory, rescanning only when it changes.
     
-    # Get all .pt model files
-    list_models = glob.glob(os.path.join(models_dir, "*.pt"))
+    Args:
+        models_dir: Directory containing the model files
     
-    if not list_models:
-        print(f"No models found in {models_dir}")
-        return None
+    Returns:
+        Tuple of (path, accuracy, frames) entries, empty if the directory is missing
+    """
+    try:
+        mtime = os.stat(models_dir).st_mtime
+    except FileNotFoundError:
+        return ()
+    return _scan_models(models_dir, mtime)
+
+
+@lru_cache(maxsize=4)
+def _build_model_index(models: Tuple[Tuple[str, float, int], ...]) -> Dict[int, str]:
+    """
+    Pick the best model per frame count.
     
-    for model_path in list_models:
-        model_name.append(os.path.basename(model_path))
+    Args:
+        models: (path, accuracy, frames) entries from list_models
     
-    # Find models matching the sequence length
-    for model_filename in model_name:
-        try:
-            # Model naming pattern: model_{accuracy}_acc_{frames}_frames_*.pt
-            parts = model_filename.split("_")
-            seq = parts[3]  # frames count is at index 3
-            if int(seq) == sequence_length:
-                sequence_model.append(model_filename)
-        except (IndexError, ValueError):
-            continue
+    Returns:
+        Dictionary mapping sequence length to the path of the most accurate model
+    """
+    candidates: Dict[int, List[Tuple[float, str]]] = {}
+    for model_path, accuracy, frames in models:
+        candidates.setdefault(frames, []).append((accuracy, model_path))
     
     # Select model with highest accuracy if multiple found
-    if len(sequence_model) > 1:
-        accuracy = []
-        for filename in sequence_model:
-            acc = filename.split("_")[1]  # accuracy is at index 1
-            accuracy.append(acc)
-        max_index = accuracy.index(max(accuracy))
-        final_model = os.path.join(models_dir, sequence_model[max_index])
-    elif len(sequence_model) == 1:
-        final_model = os.path.join(models_dir, sequence_model[0])
-    else:
-        print(f"No model found for sequence length {sequence_length}")
+    return {frames: max(entries)[1] for frames, entries in candidates.items()}
+
+
+def get_accurate_model(sequence_length: int, models_dir: str = MODELS_DIR) -> Optional[str]:
+    """
+    Select the best model based on sequence length (frame count).
+    
+    Args:
+        sequence_length: Number of frames to sample from video (10, 20, 40, 60, 80, 100)
+        models_dir: Directory containing the model files
+    
+    Returns:
+        Full path to the selected model file, or None if no model found
+    """
+    # The scan is cached per directory mtime and shared with /api/models, so
+    # checkpoints added after startup are picked up here as well
+    index = _build_model_index(list_models(models_dir))
+    
+    if not index:
+        logger.warning("No models found in %s", models_dir)
         return None
     
+    final_model = index.get(sequence_length)
+    if final_model is None:
+        logger.warning("No model found for sequence length %s", sequence_length)
+    
     return final_model
 
 
 # Global model cache to avoid reloading
+# (the lock stops concurrent first requests from loading the same model twice)
 _model_cache = {}
+_model_cache_lock = threading.Lock()
+
+
+def load_state_dict(model_path: str) -> dict:
+    """
+    Load a model checkpoint as a memory-mapped, tensors-only state dict.
+    
+    Memory-mapping avoids reading the whole file into fresh buffers and lets
+    worker processes share the page cache. Falls back to a regular load for
+    checkpoints saved in the legacy (non-zip) format, which can't be mapped.
+    
+    Args:
+        model_path: Path to the .pt checkpoint
+    
+    Returns:
+        State dict with tensors on the CPU
+    """
+    try:
+        return torch.load(model_path, map_location=torch.device('cpu'), mmap=True, weights_only=True)
+    except RuntimeError as e:
+        logger.info("Could not memory-map %s, loading normally: %s", model_path, e)
+        return torch.load(model_path, map_location=torch.device('cpu'), weights_only=True)
+
+
+def compile_model(model: Model, sequence_length: int) -> Model:
+    """
+    Compile the model with torch.compile to fuse ops and cut Python dispatch overhead.
+    
+    torch.compile is lazy, so one dummy forward pass runs here: compiler
+    errors (e.g. no C++ compiler for Inductor) surface at load time and fall
+    back to the eager model instead of failing the first request. The batch
+    dimension is dynamic because VideoBatcher sends batches of 1 to
+    VIDEO_MAX_BATCH videos, which would otherwise recompile for every size.
+    
+    Args:
+        model: Model in eval mode
+        sequence_length: Number of frames per video, for the dummy input
+    
+    Returns:
+        Compiled model, or the original model if compilation fails
+    """
+    param = next(model.parameters())
+    # 112x112 is the face crop size used by preprocessing.IM_SIZE
+    dummy = torch.zeros((1, sequence_length, 3, 112, 112), dtype=param.dtype, device=param.device)
+    
+    try:
+        compiled = torch.compile(model, mode="reduce-overhead", fullgraph=False, dynamic=True)
+        with torch.inference_mode():
+            compiled(dummy)
+        logger.info("Model compiled with torch.compile")
+        return compiled
+    except Exception as e:
+        logger.warning("torch.compile unavailable, using eager model: %s", e)
+        return model
 
 
 def load_model(sequence_length: int, device: str = "cpu") -> Optional[Model]:
@@ -106,38 +244,52 @@ def load_model(sequence_length: int, device: str = "cpu") -> Optional[Model]:
     
     # Check cache first
     if cache_key in _model_cache:
-        print(f"Using cached model for {sequence_length} frames")
+        logger.debug("Using cached model for %s frames", sequence_length)
         return _model_cache[cache_key]
     
-    # Get the model path
-    model_path = get_accurate_model(sequence_length)
-    if not model_path:
-        return None
-    
-    print(f"Loading model: {model_path}")
-    
-    try:
-        # Initialize model
-        model = Model(num_classes=2)
+    with _model_cache_lock:
+        # Another thread may have finished loading while we waited
+        if cache_key in _model_cache:
+            return _model_cache[cache_key]
         
-        # Load state dict
-        if device == "cuda" and torch.cuda.is_available():
-            model = model.cuda()
-            model.load_state_dict(torch.load(model_path))
-        else:
-            model = model.cpu()
-            model.load_state_dict(torch.load(model_path, map_location=torch.device('cpu')))
+        # Get the model path
+        model_path = get_accurate_model(sequence_length)
+        if not model_path:
+            return None
         
-        model.eval()
+        logger.info("Loading model: %s", model_path)
         
-        # Cache the model
-        _model_cache[cache_key] = model
-        print(f"Model loaded successfully for {sequence_length} frames")
-        
-        return model
-    except Exception as e:
-        print(f"Error loading model: {e}")
-        return None
+        try:
+            # Initialize model (all weights come from the checkpoint,
+            # so skip downloading the ImageNet backbone)
+            model = Model(num_classes=2, pretrained=False)
+            state_dict = load_state_dict(model_path)
+            
+            # Load state dict
+            if device == "cuda" and torch.cuda.is_available():
+                model = model.cuda()
+                model.load_state_dict(state_dict)
+            else:
+                model = model.cpu()
+                # assign=True keeps the memory-mapped tensors instead of copying them
+                model.load_state_dict(state_dict, assign=True)
+            
+            model.eval()
+            
+            if VIDEO_HALF_PRECISION and device == "cuda" and torch.cuda.is_available():
+                model = model.to(memory_format=torch.channels_last).half()
+            
+            if VIDEO_TORCH_COMPILE:
+                model = compile_model(model, sequence_length)
+            
+            # Cache the model
+            _model_cache[cache_key] = model
+            logger.info("Model loaded successfully for %s frames", sequence_length)
+            
+            return model
+        except Exception as e:
+            logger.error("Error loading model: %s", e)
+            return None
 
 
 def get_device() -> str:
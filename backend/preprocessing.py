@@ -1,11 +1,18 @@
 import torch
 from torch.utils.data import Dataset
-from torchvision import transforms
 import cv2
 import numpy as np
-from typing import List, Generator, Tuple
+import contextlib
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, List, Generator, Optional, Tuple
 import os
-import base64
+import threading
+
+from cpu_config import CPUS_PER_INSTANCE
+from model_utils import VIDEO_CPU_BF16
+
+logger = logging.getLogger(__name__)
 
 
 # Image preprocessing parameters
@@ -13,46 +20,266 @@ IM_SIZE = 112
 MEAN = [0.485, 0.456, 0.406]
 STD = [0.229, 0.224, 0.225]
 
-# Transform pipeline for video frames
-train_transforms = transforms.Compose([
-    transforms.ToPILImage(),
-    transforms.Resize((IM_SIZE, IM_SIZE)),
-    transforms.ToTensor(),
-    transforms.Normalize(MEAN, STD)
-])
+# Softmax over the class logits, shared by all predictions
+_SOFTMAX = torch.nn.Softmax(dim=1)
+
+# Normalization constants shaped for (N, 3, H, W) tensors
+_MEAN = torch.tensor(MEAN).view(1, 3, 1, 1)
+_STD = torch.tensor(STD).view(1, 3, 1, 1)
+
+
+def _cv2_cuda_available() -> bool:
+    """Check whether OpenCV was built with CUDA and can see a GPU."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+# Resize crops with OpenCV's CUDA module when available (the pip wheels are
+# CPU-only, so this needs an OpenCV build with CUDA)
+_USE_CV2_CUDA = _cv2_cuda_available()
+
+
+def _resize_cv2_cuda(frame: np.ndarray) -> np.ndarray:
+    """Resize an RGB frame to IM_SIZE x IM_SIZE on the GPU with cv2.cuda."""
+    gpu_frame = cv2.cuda_GpuMat()
+    gpu_frame.upload(np.ascontiguousarray(frame))
+    resized = cv2.cuda.resize(gpu_frame, (IM_SIZE, IM_SIZE), interpolation=cv2.INTER_AREA)
+    return resized.download()
+
+
+def batch_transform(
+    frames: List[np.ndarray],
+    out: Optional[torch.Tensor] = None,
+    bgr: bool = False
+) -> torch.Tensor:
+    """
+    Resize and normalize a list of RGB frames into one batched tensor.
+    
+    Every crop is resized straight into one preallocated (N, IM_SIZE,
+    IM_SIZE, 3) uint8 buffer, then the uint8 to float conversion and
+    normalization run once over the whole stack.
+    
+    Args:
+        frames: RGB images (H, W, 3) as uint8 numpy arrays, of any size
+        out: Optional float32 tensor of shape (N, 3, IM_SIZE, IM_SIZE) to write into
+        bgr: If True the frames are BGR and are converted to RGB after the
+            resize, on the small crop instead of the full-size one
+    
+    Returns:
+        Normalized float32 tensor of shape (N, 3, IM_SIZE, IM_SIZE)
+    """
+    resized = np.empty((len(frames), IM_SIZE, IM_SIZE, 3), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        if _USE_CV2_CUDA:
+            # Only the small resized crops are copied back to the host
+            resized[i] = _resize_cv2_cuda(frame)
+        else:
+            cv2.resize(frame, (IM_SIZE, IM_SIZE), dst=resized[i], interpolation=cv2.INTER_AREA)
+        if bgr:
+            cv2.cvtColor(resized[i], cv2.COLOR_BGR2RGB, dst=resized[i])
+    
+    # NHWC -> NCHW view; the division below writes the channels-first copy
+    resized = torch.from_numpy(resized).permute(0, 3, 1, 2)
+    
+    if out is None:
+        out = torch.empty(resized.shape, dtype=torch.float32)
+    torch.div(resized, 255.0, out=out)
+    return out.sub_(_MEAN).div_(_STD)
+
+
+def train_transforms(frame: np.ndarray) -> torch.Tensor:
+    """
+    Transform pipeline for a single video frame: resize to IM_SIZE x IM_SIZE
+    with OpenCV and normalize with the ImageNet mean/std.
+    
+    Args:
+        frame: RGB image (H, W, 3) as uint8 numpy array
+    
+    Returns:
+        Normalized float32 tensor of shape (3, IM_SIZE, IM_SIZE)
+    """
+    return batch_transform([frame])[0]
+
+# Frame sampling: "contiguous" uses the first sequence_length frames (as in
+# training), "uniform" spreads them evenly over the whole video
+FRAME_SAMPLING = os.getenv("VIDEO_FRAME_SAMPLING", "contiguous").lower()
+
+# Let FFmpeg decode on the GPU (NVDEC, VA-API, D3D11...) when the OpenCV
+# build and the machine support it; otherwise it silently uses software decode
+VIDEO_HW_DECODE = os.getenv("VIDEO_HW_DECODE", "1") == "1"
+
+
+def open_video(path: str) -> cv2.VideoCapture:
+    """
+    Open a video with the FFmpeg backend, requesting hardware-accelerated decoding.
+    
+    Args:
+        path: Path to the video file
+    
+    Returns:
+        Opened cv2.VideoCapture (falls back to the default backend if
+        the hardware-accelerated open fails)
+    """
+    if VIDEO_HW_DECODE:
+        cap = cv2.VideoCapture(
+            path,
+            cv2.CAP_FFMPEG,
+            [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        )
+        if cap.isOpened():
+            return cap
+        cap.release()
+    return cv2.VideoCapture(path)
+
+
+def sample_frames(path: str, sequence_length: int) -> Generator[np.ndarray, None, None]:
+    """
+    Yield up to sequence_length BGR frames from a video.
+    
+    Frames are advanced with grab(), which still decodes every frame with
+    the FFmpeg backend; retrieve() only runs the color conversion to BGR,
+    so that step is skipped for frames that are not sampled. Reading stops
+    as soon as sequence_length frames have been yielded, so nothing past the
+    last sample is decoded.
+    
+    Args:
+        path: Path to the video file
+        sequence_length: Number of frames to yield
+    
+    Yields:
+        BGR frames as numpy arrays
+    """
+    cap = open_video(path)
+    try:
+        step = 1
+        if FRAME_SAMPLING == "uniform":
+            total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            step = max(1, total // sequence_length)
+        
+        collected = 0
+        index = 0
+        while collected < sequence_length and cap.grab():
+            if index % step == 0:
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                collected += 1
+                yield frame
+            index += 1
+    finally:
+        cap.release()
+
+
+# Keep OpenCV's own thread pool within this worker's share of the cores
+cv2.setNumThreads(CPUS_PER_INSTANCE)
+
+# Number of threads running face detection in parallel (OpenCV releases the GIL)
+FACE_DETECT_WORKERS = int(os.getenv("FACE_DETECT_WORKERS", str(min(8, CPUS_PER_INSTANCE))))
+_face_detect_pool = ThreadPoolExecutor(max_workers=FACE_DETECT_WORKERS, thread_name_prefix="face-detect")
+
+# Background threads for writing preprocessed images to disk
+_IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-io")
+
+# Run face detection every N frames and reuse the box in between (only with
+# contiguous frame sampling; uniformly sampled frames are all detected)
+FACE_DETECT_INTERVAL = int(os.getenv("FACE_DETECT_INTERVAL", "10"))
+
+# YuNet CNN face detector (ONNX, run by OpenCV's DNN module); used when the
+# model file is present, otherwise detection falls back to the Haar cascade
+FACE_DETECTOR_MODEL = os.getenv("FACE_DETECTOR_MODEL", "models/face_detection_yunet_2023mar.onnx")
+FACE_SCORE_THRESHOLD = float(os.getenv("FACE_SCORE_THRESHOLD", "0.7"))
+
+# Frames are downscaled so their longest side is at most this many pixels
+# before face detection (boxes are mapped back to full resolution)
+FACE_DETECT_MAX_SIZE = int(os.getenv("FACE_DETECT_MAX_SIZE", "640"))
+_use_dnn_detector = os.path.exists(FACE_DETECTOR_MODEL)
 
 # OpenCV DNN face detector (lightweight, no dlib needed)
 # Using OpenCV's built-in DNN face detector
-_face_detector = None
+# Detectors are not thread-safe, so each worker thread gets its own
+_face_detector = threading.local()
+
+def get_dnn_face_detector(width: int, height: int):
+    """
+    Get or initialize the YuNet face detector for the current thread.
+    
+    Args:
+        width: Width of the images that will be passed to the detector
+        height: Height of the images that will be passed to the detector
+    
+    Returns:
+        cv2.FaceDetectorYN instance, or None if the model is unavailable
+    """
+    global _use_dnn_detector
+    if not _use_dnn_detector:
+        return None
+    
+    detector = getattr(_face_detector, "dnn_detector", None)
+    if detector is None:
+        try:
+            detector = cv2.FaceDetectorYN.create(
+                FACE_DETECTOR_MODEL, "", (width, height), FACE_SCORE_THRESHOLD
+            )
+        except cv2.error as e:
+            logger.warning("Could not load face detector %s, using Haar cascade: %s", FACE_DETECTOR_MODEL, e)
+            _use_dnn_detector = False
+            return None
+        _face_detector.dnn_detector = detector
+    else:
+        detector.setInputSize((width, height))
+    return detector
+
 
 def get_face_detector():
     """
-    Get or initialize the OpenCV DNN face detector.
+    Get or initialize the OpenCV DNN face detector for the current thread.
     Uses OpenCV's built-in Caffe model for face detection.
     """
-    global _face_detector
-    if _face_detector is None:
+    detector = getattr(_face_detector, "detector", None)
+    if detector is None:
         # Use OpenCV's built-in Haar Cascade as fallback (always available)
         cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        _face_detector = cv2.CascadeClassifier(cascade_path)
-    return _face_detector
+        detector = cv2.CascadeClassifier(cascade_path)
+        _face_detector.detector = detector
+    return detector
 
 
 def detect_faces_opencv(frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
     """
-    Detect faces using OpenCV's Haar Cascade detector.
+    Detect faces using OpenCV's YuNet detector, or the Haar Cascade detector
+    when the YuNet model is not available.
     
     Args:
-        frame: RGB image as numpy array
+        frame: BGR image as numpy array (as decoded by OpenCV)
         
     Returns:
         List of face locations as (top, right, bottom, left) tuples
         (same format as face_recognition library for compatibility)
     """
+    height, width = frame.shape[:2]
+    dnn_detector = get_dnn_face_detector(width, height)
+    if dnn_detector is not None:
+        # Rows are [x, y, w, h, landmarks..., score]
+        _, faces = dnn_detector.detect(frame)
+        if faces is None:
+            return []
+        
+        face_locations = []
+        for face in sorted(faces, key=lambda f: f[-1], reverse=True):
+            x, y, w, h = face[:4]
+            top = max(0, int(y))
+            right = min(width, int(x + w))
+            bottom = min(height, int(y + h))
+            left = max(0, int(x))
+            face_locations.append((top, right, bottom, left))
+        return face_locations
+    
     detector = get_face_detector()
     
     # Convert to grayscale for Haar cascade
-    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     
     # Detect faces
     faces = detector.detectMultiScale(
@@ -75,6 +302,44 @@ def detect_faces_opencv(frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
     return face_locations
 
 
+def detect_faces_downscaled(frame: np.ndarray, max_size: int = FACE_DETECT_MAX_SIZE) -> List[Tuple[int, int, int, int]]:
+    """
+    Detect faces on a downscaled copy of the frame.
+    
+    Detection cost grows with the pixel count, and face crops do not need
+    pixel-exact boxes, so large frames are shrunk before detection.
+    
+    Args:
+        frame: BGR image as numpy array
+        max_size: Maximum length of the longest side used for detection
+        
+    Returns:
+        List of face locations as (top, right, bottom, left) tuples in
+        full-resolution coordinates
+    """
+    height, width = frame.shape[:2]
+    scale_factor = min(1.0, max_size / max(height, width))
+    if scale_factor == 1.0:
+        return detect_faces_opencv(frame)
+    
+    small_frame = cv2.resize(
+        frame,
+        (round(width * scale_factor), round(height * scale_factor)),
+        interpolation=cv2.INTER_AREA
+    )
+    
+    # Scale bounding boxes back to original resolution
+    return [
+        (
+            int(top / scale_factor),
+            min(width, int(right / scale_factor)),
+            min(height, int(bottom / scale_factor)),
+            int(left / scale_factor)
+        )
+        for top, right, bottom, left in detect_faces_opencv(small_frame)
+    ]
+
+
 class ValidationDataset(Dataset):
     """
     Dataset for processing a single video file for validation/prediction.
@@ -90,53 +355,201 @@ class ValidationDataset(Dataset):
         return 1  # Single video
     
     def __getitem__(self, idx):
-        frames = []
-        
-        # Extract frames from video
-        for i, frame in enumerate(self.frame_extract(self.video_path)):
-            # Convert BGR to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Detect face in frame using OpenCV
-            faces = detect_faces_opencv(rgb_frame)
-            try:
-                top, right, bottom, left = faces[0]
-                frame = rgb_frame[top:bottom, left:right, :]
-            except (IndexError, ValueError):
-                # No face detected, use full frame
-                frame = rgb_frame
-            
-            frames.append(self.transform(frame))
-            
-            if len(frames) == self.sequence_length:
-                break
-        
-        # If not enough frames, repeat the last frame
-        if len(frames) < self.sequence_length:
-            last_frame = frames[-1] if frames else torch.zeros(3, IM_SIZE, IM_SIZE)
-            while len(frames) < self.sequence_length:
-                frames.append(last_frame)
-        
-        frames = torch.stack(frames)
-        frames = frames[:self.sequence_length]
-        return frames.unsqueeze(0)
+        # Same frame sampling, face cropping and transforms as the API path
+        transform = None if self.transform is train_transforms else self.transform
+        return _sample_and_transform(self.video_path, self.sequence_length, transform)[0]
     
     def frame_extract(self, path: str) -> Generator[np.ndarray, None, None]:
-        """Extract frames from video file"""
-        vidObj = cv2.VideoCapture(path)
-        success = True
-        while success:
-            success, image = vidObj.read()
-            if success:
-                yield image
-        vidObj.release()
+        """Extract the sampled frames from video file"""
+        return sample_frames(path, self.sequence_length)
+
+
+def find_face_box(frame: np.ndarray, padding: int = 40) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Detect the first face in a frame and return its padded bounding box.
+    
+    Args:
+        frame: BGR image as numpy array
+        padding: Pixels added around the detected face box
+    
+    Returns:
+        (top, right, bottom, left) box in full-resolution coordinates,
+        or None if no face was found
+    """
+    # Face detection using OpenCV (much lighter than dlib/face_recognition)
+    # Using scaled frame for faster detection
+    face_locations = detect_faces_downscaled(frame)
+    
+    if len(face_locations) == 0:
+        return None
+    
+    top, right, bottom, left = face_locations[0]
+    
+    # Apply padding (on original resolution coordinates)
+    top = max(0, top - padding)
+    bottom = min(frame.shape[0], bottom + padding)
+    left = max(0, left - padding)
+    right = min(frame.shape[1], right + padding)
+    
+    return top, right, bottom, left
+
+
+def crop_box(frame: np.ndarray, box: Optional[Tuple[int, int, int, int]]) -> np.ndarray:
+    """
+    Crop a (top, right, bottom, left) box from a frame, or return the whole frame if box is None.
+    """
+    if box is None:
+        return frame
+    top, right, bottom, left = box
+    return frame[top:bottom, left:right]
+
+
+def find_face_boxes(
+    frames: List[np.ndarray],
+    interval: Optional[int] = None
+) -> Tuple[List[Optional[Tuple[int, int, int, int]]], List[bool]]:
+    """
+    Find the face box of every frame, running the detector only every ``interval`` frames.
+    
+    Faces barely move between consecutive frames, so frames in between
+    reuse the box of the last detected frame. If detection found no face on
+    a detected frame, the following frames are detected individually.
+    Detection runs in parallel on the face detection thread pool.
+    
+    Args:
+        frames: BGR images as numpy arrays
+        interval: Run detection on every interval-th frame (1 = every frame).
+            Defaults to FACE_DETECT_INTERVAL for contiguous sampling and to 1
+            for uniform sampling, where neighbouring samples can be seconds apart
+    
+    Returns:
+        Tuple of (boxes, detected)
+        boxes: (top, right, bottom, left) box or None, one per frame
+        detected: Per frame, whether the detector ran on that frame and found
+            a face (False for frames that reuse their keyframe's box)
+    """
+    if interval is None:
+        interval = FACE_DETECT_INTERVAL if FRAME_SAMPLING == "contiguous" else 1
+    interval = max(1, interval)
+    boxes = [None] * len(frames)
+    
+    keyframes = list(range(0, len(frames), interval))
+    for i, box in zip(keyframes, _face_detect_pool.map(find_face_box, [frames[i] for i in keyframes])):
+        boxes[i] = box
+    
+    # Frames following a keyframe without a face get their own detection
+    missed = [i for i in range(len(frames)) if i % interval and boxes[i - i % interval] is None]
+    for i, box in zip(missed, _face_detect_pool.map(find_face_box, [frames[i] for i in missed])):
+        boxes[i] = box
+    
+    detected = [box is not None for box in boxes]
+    
+    # Everything else reuses its keyframe's box
+    for i in range(len(frames)):
+        if i % interval and boxes[i] is None:
+            boxes[i] = boxes[i - i % interval]
+    
+    return boxes, detected
+
+
+def encode_display_image(image: np.ndarray) -> bytes:
+    """
+    Encode a frame as a JPEG thumbnail for frontend display.
+    
+    Args:
+        image: BGR image as numpy array
+    
+    Returns:
+        JPEG bytes of the image resized to 224x224
+    """
+    display_image = cv2.resize(image, (224, 224))
+    _, buffer = cv2.imencode('.jpg', display_image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return buffer.tobytes()
+
+
+def _sample_and_transform(
+    video_path: str,
+    sequence_length: int,
+    transform: Optional[Callable[[np.ndarray], torch.Tensor]] = None,
+    pin_memory: bool = False
+) -> tuple:
+    """
+    Sample frames from a video, crop the faces and build the model input.
+    
+    Args:
+        video_path: Path to the video file
+        sequence_length: Number of frames to extract
+        transform: Optional per-frame transform; by default all frames go
+            through batch_transform at once
+        pin_memory: Allocate the output in pinned memory. Only the API path
+            sets this; pinning initializes CUDA, which fails inside forked
+            DataLoader workers (use DataLoader(pin_memory=True) there)
+    
+    Returns:
+        Tuple of (frames_tensor, frames, face_boxes, face_detected)
+        frames_tensor: Model input of shape (1, sequence_length, 3, IM_SIZE, IM_SIZE)
+        frames: Sampled BGR frames as decoded
+        face_boxes: (top, right, bottom, left) face box of each frame, or None when no face was found
+        face_detected: Whether the detector found a face on each frame (see find_face_boxes)
+    """
+    # Read video, decoding only the frames that are used; frames stay BGR
+    # (detection works on BGR) and only the crops are converted to RGB
+    frames = list(sample_frames(video_path, sequence_length))
+    num_frames = len(frames)
+    
+    # Preallocate the output tensor and fill it in place; pinned memory
+    # allows an asynchronous host-to-GPU copy in predict()
+    frames_tensor = torch.empty(
+        (1, sequence_length, 3, IM_SIZE, IM_SIZE),
+        dtype=torch.float32,
+        pin_memory=pin_memory
+    )
+    
+    # Find the face in every frame (detection runs in parallel, every FACE_DETECT_INTERVAL frames)
+    face_boxes, face_detected = find_face_boxes(frames)
+    
+    # Crop faces from the ORIGINAL full-resolution frames; no face detected, use full frame
+    crops = [crop_box(frame, box) for frame, box in zip(frames, face_boxes)]
+    
+    # Apply transforms to all frames at once, directly into the output tensor
+    if num_frames > 0:
+        if transform is None:
+            # The BGR -> RGB swap happens on the resized crops
+            batch_transform(crops, out=frames_tensor[0, :num_frames], bgr=True)
+        else:
+            for i, crop in enumerate(crops):
+                frames_tensor[0, i].copy_(transform(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)))
+    
+    # Handle case where not enough frames: repeat the last frame
+    if num_frames < sequence_length:
+        if num_frames > 0:
+            frames_tensor[0, num_frames:] = frames_tensor[0, num_frames - 1]
+        else:
+            frames_tensor.zero_()
+    
+    return frames_tensor, frames, face_boxes, face_detected
+
+
+def prepare_single_video(video_path: str, sequence_length: int) -> torch.Tensor:
+    """
+    Build the model input for one video without the Dataset/DataLoader wrapper.
+    
+    Args:
+        video_path: Path to the video file
+        sequence_length: Number of frames to extract
+    
+    Returns:
+        Preprocessed video tensor of shape (1, sequence_length, 3, IM_SIZE, IM_SIZE)
+    """
+    return _sample_and_transform(video_path, sequence_length, pin_memory=torch.cuda.is_available())[0]
 
 
 def preprocess_video(
     video_path: str,
     sequence_length: int,
     save_preprocessed: bool = False,
-    output_dir: str = "temp_frames"
+    output_dir: str = "temp_frames",
+    max_display_frames: int = 6
 ) -> tuple:
     """
     Preprocess video for model prediction.
@@ -146,114 +559,64 @@ def preprocess_video(
         sequence_length: Number of frames to extract
         save_preprocessed: Whether to save preprocessed images
         output_dir: Directory to save preprocessed images
+        max_display_frames: Number of frames to encode as JPEG thumbnails for display
     
     Returns:
-        Tuple of (preprocessed_tensor, preprocessed_images_list, face_cropped_images_list, faces_found)
+        Tuple of (preprocessed_tensor, saved_image_paths, display_images, faces_found, frames_analyzed)
+        display_images: JPEG bytes of the (face-cropped) frames used, at most max_display_frames
+        faces_found: Number of frames on which the detector found a face; frames
+            that only reuse a keyframe's box are not counted
     """
     preprocessed_images = []
-    face_cropped_images = []
+    display_images = []
     
     # Create output directory if saving images
     if save_preprocessed and not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
-    # Read video
-    cap = cv2.VideoCapture(video_path)
-    frames = []
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if ret:
-            frames.append(frame)
-        else:
-            break
-    cap.release()
+    frames_tensor, frames, face_boxes, face_detected = _sample_and_transform(
+        video_path, sequence_length, pin_memory=torch.cuda.is_available()
+    )
     
-    print(f"Total frames extracted: {len(frames)}")
+    logger.debug("Total frames extracted: %s", len(frames))
     
-    # Process frames
-    padding = 40
+    # Collect saved images and display thumbnails; PNG encoding and disk
+    # writes run on the IO pool while the loop continues
     faces_found = 0
-    processed_frames = []
+    save_futures = []
+    num_frames = len(frames)
     
-    for i in range(min(sequence_length, len(frames))):
-        frame = frames[i]
-        
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    for i, (frame, face_box, detected) in enumerate(zip(frames, face_boxes, face_detected)):
+        # BGR frame or face crop that was fed to the model
+        face_frame = crop_box(frame, face_box)
         
         # Save preprocessed image if requested
         if save_preprocessed:
             preprocessed_path = os.path.join(output_dir, f"frame_{i+1}.png")
-            cv2.imwrite(preprocessed_path, cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2BGR))
+            save_futures.append(_IO_POOL.submit(cv2.imwrite, preprocessed_path, frame))
             preprocessed_images.append(preprocessed_path)
         
-        # Face detection using OpenCV (much lighter than dlib/face_recognition)
-        # Using scaled frame for faster detection
-        scale_factor = 0.5  # Less aggressive scaling since Haar is already fast
-        small_frame = cv2.resize(rgb_frame, (0, 0), fx=scale_factor, fy=scale_factor)
-        
-        # Detect faces on the smaller frame
-        face_locations_small = detect_faces_opencv(small_frame)
-        
-        if len(face_locations_small) > 0:
-            # Scale bounding box back to original resolution
-            top_small, right_small, bottom_small, left_small = face_locations_small[0]
-            top = int(top_small / scale_factor)
-            right = int(right_small / scale_factor)
-            bottom = int(bottom_small / scale_factor)
-            left = int(left_small / scale_factor)
-            
-            # Apply padding (on original resolution coordinates)
-            top = max(0, top - padding)
-            bottom = min(rgb_frame.shape[0], bottom + padding)
-            left = max(0, left - padding)
-            right = min(rgb_frame.shape[1], right + padding)
-            
-            # Crop face from ORIGINAL full-resolution frame
-            frame_face = rgb_frame[top:bottom, left:right]
-            
+        if face_box is not None:
             # Save cropped face if requested
             if save_preprocessed:
                 face_path = os.path.join(output_dir, f"face_{i+1}.png")
-                cv2.imwrite(face_path, cv2.cvtColor(frame_face, cv2.COLOR_RGB2BGR))
-                face_cropped_images.append(face_path)
-            
-            # Create base64 encoded image for frontend display
-            # Resize to reasonable size for display (224x224)
-            display_face = cv2.resize(frame_face, (224, 224))
-            _, buffer = cv2.imencode('.jpg', cv2.cvtColor(display_face, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 85])
-            base64_face = base64.b64encode(buffer).decode('utf-8')
-            face_cropped_images.append(f"data:image/jpeg;base64,{base64_face}")
-            
+                save_futures.append(_IO_POOL.submit(cv2.imwrite, face_path, face_frame))
+                preprocessed_images.append(face_path)
+        
+        # Only frames the detector actually ran on count, not reused boxes
+        if detected:
             faces_found += 1
-            processed_frame = frame_face
-        else:
-            # No face detected, use full frame
-            processed_frame = rgb_frame
-            
-            # For display, resize full frame to show what was used
-            display_frame = cv2.resize(rgb_frame, (224, 224))
-            _, buffer = cv2.imencode('.jpg', cv2.cvtColor(display_frame, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 85])
-            base64_frame = base64.b64encode(buffer).decode('utf-8')
-            face_cropped_images.append(f"data:image/jpeg;base64,{base64_frame}")
         
-        # Apply transforms
-        transformed_frame = train_transforms(processed_frame)
-        processed_frames.append(transformed_frame)
-    
-    print(f"Faces detected: {faces_found}/{sequence_length}")
+        # Encode a thumbnail of what was used, only for the frames shown in the frontend
+        if i < max_display_frames:
+            display_images.append(encode_display_image(face_frame))
     
-    # Handle case where not enough frames
-    if len(processed_frames) < sequence_length:
-        last_frame = processed_frames[-1] if processed_frames else torch.zeros(3, IM_SIZE, IM_SIZE)
-        while len(processed_frames) < sequence_length:
-            processed_frames.append(last_frame)
+    logger.debug("Faces detected: %s/%s", faces_found, sequence_length)
     
-    # Stack frames into tensor
-    frames_tensor = torch.stack(processed_frames[:sequence_length])
-    frames_tensor = frames_tensor.unsqueeze(0)  # Add batch dimension
+    # Make sure the saved images exist before their paths are returned
+    wait(save_futures)
     
-    return frames_tensor, preprocessed_images, face_cropped_images, faces_found
+    return frames_tensor, preprocessed_images, display_images, faces_found, num_frames
 
 
 def predict(model, img_tensor, device: str = "cpu"):
@@ -270,19 +633,51 @@ def predict(model, img_tensor, device: str = "cpu"):
         prediction: 0 for FAKE, 1 for REAL
         confidence: Confidence percentage (0-100)
     """
-    sm = torch.nn.Softmax(dim=1)
+    return predict_batch(model, img_tensor, device)[0]
+
+
+def predict_batch(model, img_tensor, device: str = "cpu", stream=None) -> List[Tuple[int, float]]:
+    """
+    Make predictions on a batch of preprocessed video tensors in one forward pass.
     
-    # Move tensor to device
-    if device == "cuda":
-        img_tensor = img_tensor.cuda()
-    else:
-        img_tensor = img_tensor.cpu()
+    Args:
+        model: Loaded PyTorch model
+        img_tensor: Batch of preprocessed videos, shape (batch, seq, 3, H, W)
+        device: 'cpu' or 'cuda'
+        stream: Optional torch.cuda.Stream to run the copy and forward pass on
+    
+    Returns:
+        List of (prediction, confidence) tuples, one per video in the batch
+    """
+    # On a side stream the copy and kernels of this batch can overlap with
+    # work queued by other threads on their own streams
+    stream_context = torch.cuda.stream(stream) if stream is not None else contextlib.nullcontext()
+    # CUDA models are already converted to FP16 at load time
+    autocast_context = (
+        torch.autocast(device_type="cpu", dtype=torch.bfloat16)
+        if VIDEO_CPU_BF16 and device == "cpu" else contextlib.nullcontext()
+    )
+    if stream is not None:
+        # Make sure work already queued on the default stream (e.g. weight copies) is visible
+        stream.wait_stream(torch.cuda.current_stream())
     
-    # Forward pass
-    with torch.no_grad():
-        fmap, logits = model(img_tensor)
-        logits = sm(logits)
-        _, prediction = torch.max(logits, 1)
-        confidence = logits[0, int(prediction.item())].item() * 100
+    with stream_context:
+        # Move tensor to device (matching the model's dtype, FP16 on CUDA);
+        # the copy is asynchronous when the tensor is in pinned memory
+        img_tensor = img_tensor.to(device, dtype=next(model.parameters()).dtype, non_blocking=True)
+        
+        # Forward pass (inference_mode skips autograd bookkeeping entirely)
+        with torch.inference_mode(), autocast_context:
+            fmap, logits = model(img_tensor)
+            # Softmax in FP32 for numerical stability
+            probs = _SOFTMAX(logits.float())
+            confidences, predictions = probs.max(dim=1)
+        
+        # Only wait for this stream's work before reading the results
+        if stream is not None:
+            stream.synchronize()
     
-    return int(prediction.item()), confidence
+    return [
+        (int(prediction), confidence * 100)
+        for prediction, confidence in zip(predictions.tolist(), confidences.tolist())
+    ]
@@ -1,19 +1,46 @@
+import logging
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging once for the whole application
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Size the OpenMP/MKL thread pools before torch is imported so that several
+# uvicorn workers (WEB_CONCURRENCY) share the cores instead of oversubscribing them
+from cpu_config import CPUS_PER_INSTANCE, NUM_INSTANCES
+
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", CPUS_PER_INSTANCE))
+os.environ.setdefault("OMP_NUM_THREADS", str(TORCH_NUM_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(TORCH_NUM_THREADS))
+
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import os
-import tempfile
+from fastapi.responses import FileResponse, JSONResponse
+import asyncio
+import aiofiles
+import re
 import shutil
-from dotenv import load_dotenv
-from model_utils import load_model, get_device
-from preprocessing import preprocess_video, predict
+import tempfile
+import time
+import uuid
+import torch
+from model_utils import load_model, get_device, list_models, MODELS_DIR
+from preprocessing import preprocess_video
+from video_batcher import VideoBatcher
 
 # Audio deepfake detection imports (separate from video pipeline)
-from audio_predict import predict_audio, AudioPredictionError
-from audio_preprocessing import AudioValidationError, AudioLoadError
+from audio_predict import AudioPredictionError, warmup_audio_pipeline
+from audio_batcher import AudioBatcher
+from audio_preprocessing import AudioValidationError, AudioLoadError, MAX_AUDIO_FILE_SIZE
 
-# Load environment variables
-load_dotenv()
+torch.set_num_threads(TORCH_NUM_THREADS)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -37,9 +64,9 @@ allowed_origins = [
 # Add production frontend URL if specified
 if frontend_url:
     allowed_origins.append(frontend_url)
-    print(f"✓ Production frontend URL added to CORS: {frontend_url}")
+    logger.info("Production frontend URL added to CORS: %s", frontend_url)
 else:
-    print("✓ Development mode: Using localhost CORS origins")
+    logger.info("Development mode: Using localhost CORS origins")
 
 # Configure CORS middleware
 app.add_middleware(
@@ -50,10 +77,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-print("\n=== Deepfake Detection Server Configuration ===")
-print(f"Allowed CORS origins: {allowed_origins}")
-print(f"Device: {get_device()}")
-print("=" * 50 + "\n")
+logger.info("Allowed CORS origins: %s", allowed_origins)
+logger.info("Device: %s", get_device())
+logger.info("Torch threads: %s (workers: %s)", TORCH_NUM_THREADS, NUM_INSTANCES)
+
+# Supported frame counts for the video models
+VALID_SEQUENCE_LENGTHS = [10, 20, 40, 60, 80, 100]
+
+# Concurrent video predictions with the same sequence length share a forward pass
+video_batcher = VideoBatcher(get_device())
+
+# Load all models at startup so the first request doesn't pay the load cost
+WARMUP_MODELS = os.getenv("WARMUP_MODELS", "1") == "1"
+
+def _warmup_models():
+    """Load the audio pipeline and every video model into the caches."""
+    try:
+        warmup_audio_pipeline()
+    except Exception as e:
+        logger.warning("Audio model warmup failed: %s", e)
+    
+    device = get_device()
+    for sequence_length in VALID_SEQUENCE_LENGTHS:
+        if load_model(sequence_length, device) is None:
+            logger.warning("No video model loaded for %s frames", sequence_length)
+
+
+@app.on_event("startup")
+async def warmup_models():
+    """Eagerly load models before the server starts accepting requests."""
+    if WARMUP_MODELS:
+        logger.info("Warming up models...")
+        await asyncio.to_thread(_warmup_models)
+        logger.info("Models ready")
 
 
 @app.get("/")
@@ -68,6 +124,93 @@ async def root():
     }
 
 
+# Chunk size used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def save_upload(file: UploadFile, path: str) -> None:
+    """Stream an uploaded file to disk in chunks without blocking the event loop."""
+    async with aiofiles.open(path, 'wb') as out_file:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await out_file.write(chunk)
+
+
+async def read_upload(file: UploadFile, max_size: int) -> bytes:
+    """
+    Read an uploaded file into memory in large chunks, stopping early if it is too big.
+    
+    Args:
+        file: Uploaded file
+        max_size: Maximum accepted size in bytes
+    
+    Returns:
+        File contents
+    
+    Raises:
+        AudioValidationError: If the file is larger than max_size
+    """
+    too_large = AudioValidationError(f"Audio file too large (max {max_size // (1024 * 1024)}MB)")
+    if file.size is not None and file.size > max_size:
+        raise too_large
+    
+    data = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        data += chunk
+        if len(data) > max_size:
+            raise too_large
+    return bytes(data)
+
+
+# Analyzed frame JPEGs per prediction job, served by /api/predict/frames.
+# They are kept on disk (one directory per job) so that every uvicorn
+# worker can serve frames of jobs handled by another worker
+FRAME_CACHE_DIR = os.getenv("FRAME_CACHE_DIR", os.path.join(tempfile.gettempdir(), "deepfake_frames"))
+FRAME_CACHE_SIZE = int(os.getenv("FRAME_CACHE_SIZE", "100"))
+FRAME_CACHE_TTL = int(os.getenv("FRAME_CACHE_TTL", "300"))
+_JOB_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def _prune_frame_cache() -> None:
+    """Delete expired jobs, then the oldest ones beyond FRAME_CACHE_SIZE."""
+    try:
+        with os.scandir(FRAME_CACHE_DIR) as entries:
+            jobs = []
+            for entry in entries:
+                try:
+                    jobs.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    continue  # Removed by another worker
+    except FileNotFoundError:
+        return
+    
+    jobs.sort(reverse=True)
+    expiry = time.time() - FRAME_CACHE_TTL
+    for position, (mtime, path) in enumerate(jobs):
+        if mtime < expiry or position >= FRAME_CACHE_SIZE:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _store_frames(job_id: str, images: list) -> None:
+    """
+    Write a job's frame JPEGs to the shared frame cache directory.
+    
+    Args:
+        job_id: Job ID (hex UUID)
+        images: JPEG bytes of each frame
+    """
+    _prune_frame_cache()
+    
+    # Write into a temporary directory and rename it into place, so readers
+    # never see a partially written job
+    job_dir = os.path.join(FRAME_CACHE_DIR, job_id)
+    tmp_dir = f"{job_dir}.tmp"
+    os.makedirs(tmp_dir)
+    for idx, image in enumerate(images):
+        with open(os.path.join(tmp_dir, f"{idx}.jpg"), "wb") as out_file:
+            out_file.write(image)
+    os.replace(tmp_dir, job_dir)
+
+
 @app.post("/api/predict")
 async def predict_video_endpoint(
     file: UploadFile = File(...),
@@ -89,11 +232,10 @@ async def predict_video_endpoint(
     
     try:
         # Validate sequence length
-        valid_lengths = [10, 20, 40, 60, 80, 100]
-        if sequence_length not in valid_lengths:
+        if sequence_length not in VALID_SEQUENCE_LENGTHS:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid sequence_length. Must be one of {valid_lengths}"
+                detail=f"Invalid sequence_length. Must be one of {VALID_SEQUENCE_LENGTHS}"
             )
         
         # Validate file type
@@ -103,22 +245,24 @@ async def predict_video_endpoint(
                 detail="File must be a video"
             )
         
-        print(f"\n{'='*50}")
-        print(f"Processing video: {file.filename}")
-        print(f"Sequence length: {sequence_length} frames")
-        print(f"Face focus: {face_focus}")
-        print(f"{'='*50}\n")
-        
-        # Save uploaded video to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_video_path = temp_file.name
+        logger.info(
+            "Processing video: %s (sequence length: %s, face focus: %s)",
+            file.filename, sequence_length, face_focus
+        )
         
-        print(f"✓ Video saved to: {temp_video_path}")
+        # Create temporary file for the uploaded video
+        fd, temp_video_path = tempfile.mkstemp(suffix=os.path.splitext(file.filename)[1])
+        os.close(fd)
         
-        # Load model for the specified sequence length
+        # Stream the upload to disk while the model for the specified
+        # sequence length is loaded in a worker thread
         device = get_device()
-        model = load_model(sequence_length, device)
+        _, model = await asyncio.gather(
+            save_upload(file, temp_video_path),
+            asyncio.to_thread(load_model, sequence_length, device)
+        )
+        
+        logger.debug("Video saved to: %s", temp_video_path)
         
         if model is None:
             raise HTTPException(
@@ -126,33 +270,26 @@ async def predict_video_endpoint(
                 detail=f"Failed to load model for {sequence_length} frames"
             )
         
-        print(f"✓ Model loaded successfully")
-        
-        # Preprocess video
-        print(f"⏳ Preprocessing video...")
-        frames_tensor, preprocessed_images, face_cropped_images, faces_found = preprocess_video(
+        # Preprocess video (decoding and face detection are blocking,
+        # so keep them off the event loop)
+        frames_tensor, preprocessed_images, display_images, faces_found, num_frames = await asyncio.to_thread(
+            preprocess_video,
             temp_video_path,
             sequence_length,
             save_preprocessed=False  # Set to True if you want to save frames
         )
         
-        print(f"✓ Preprocessing complete")
-        
         # Make prediction
-        print(f"⏳ Running prediction...")
-        prediction_int, confidence = predict(model, frames_tensor, device)
+        prediction_int, confidence = await video_batcher.submit(frames_tensor, sequence_length)
         
         # Convert prediction to label
         prediction_label = "REAL" if prediction_int == 1 else "FAKE"
         
-        print(f"\n{'='*50}")
-        print(f"✓ PREDICTION: {prediction_label}")
-        print(f"✓ CONFIDENCE: {confidence:.1f}%")
-        print(f"{'='*50}\n")
+        logger.info("Video prediction: %s (%.1f%%)", prediction_label, confidence)
         
-        # Return response with frame images for frontend display
-        # Limit to max 6 frames to keep response size reasonable
-        display_frames = face_cropped_images[:6] if len(face_cropped_images) > 6 else face_cropped_images
+        # Keep the frame JPEGs server-side; the response only carries their URLs
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(_store_frames, job_id, display_images)
         
         return JSONResponse(content={
             "prediction": prediction_label,
@@ -160,16 +297,17 @@ async def predict_video_endpoint(
             "sequence_length": sequence_length,
             "device": device,
             "faces_found": faces_found,
-            "total_frames_analyzed": len(face_cropped_images),
-            "frame_images": display_frames
+            "total_frames_analyzed": num_frames,
+            "job_id": job_id,
+            "frame_images": [
+                f"/api/predict/frames/{job_id}/{idx}" for idx in range(len(display_images))
+            ]
         })
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"\n❌ Error during prediction: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error during video prediction")
         raise HTTPException(
             status_code=500,
             detail=f"Prediction failed: {str(e)}"
@@ -179,15 +317,46 @@ async def predict_video_endpoint(
         if temp_video_path and os.path.exists(temp_video_path):
             try:
                 os.unlink(temp_video_path)
-                print(f"✓ Cleaned up temporary file")
             except Exception as e:
-                print(f"⚠ Warning: Could not delete temporary file: {e}")
+                logger.warning("Could not delete temporary file: %s", e)
+
+
+@app.get("/api/predict/frames/{job_id}/{idx}")
+async def get_frame_image(job_id: str, idx: int):
+    """
+    Serve one analyzed frame of a video prediction as a JPEG.
+    
+    Args:
+        job_id: Job ID returned by /api/predict
+        idx: Index of the frame in the response's frame_images
+    
+    Returns:
+        JPEG image response
+    """
+    not_found = HTTPException(status_code=404, detail="Frame not found or expired")
+    if not _JOB_ID_RE.fullmatch(job_id) or idx < 0:
+        raise not_found
+    
+    job_dir = os.path.join(FRAME_CACHE_DIR, job_id)
+    frame_path = os.path.join(job_dir, f"{idx}.jpg")
+    try:
+        stored_at = os.stat(job_dir).st_mtime
+    except FileNotFoundError:
+        raise not_found
+    if stored_at < time.time() - FRAME_CACHE_TTL or not os.path.isfile(frame_path):
+        raise not_found
+    
+    return FileResponse(frame_path, media_type="image/jpeg")
 
 
 # =============================================================================
 # AUDIO DEEPFAKE DETECTION ENDPOINT
 # =============================================================================
 
+# Concurrent audio uploads are classified together in one pipeline call
+audio_batcher = AudioBatcher()
+
+
 @app.post("/api/audio/predict")
 async def predict_audio_endpoint(file: UploadFile = File(...)):
     """
@@ -207,8 +376,6 @@ async def predict_audio_endpoint(file: UploadFile = File(...)):
             "all_scores": {"real": float, "fake": float}
         }
     """
-    temp_audio_path = None
-    
     try:
         # Validate content type
         if file.content_type and not file.content_type.startswith('audio/'):
@@ -217,87 +384,56 @@ async def predict_audio_endpoint(file: UploadFile = File(...)):
                 detail="File must be an audio file"
             )
         
-        print(f"\n{'='*50}")
-        print(f"Processing audio: {file.filename}")
-        print(f"Content type: {file.content_type}")
-        print(f"{'='*50}\n")
-        
-        # Get file extension from filename
-        file_ext = os.path.splitext(file.filename)[1] if file.filename else '.wav'
+        logger.info("Processing audio: %s (content type: %s)", file.filename, file.content_type)
         
-        # Save uploaded audio to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_audio_path = temp_file.name
+        # Filename picks the decoder (treated as WAV when missing)
+        filename = file.filename or 'audio.wav'
         
-        print(f"✓ Audio saved to: {temp_audio_path}")
+        # Keep the upload in memory; it is decoded straight into an array
+        audio_bytes = await read_upload(file, MAX_AUDIO_FILE_SIZE)
         
         # Run audio prediction
-        print(f"⏳ Running audio deepfake detection...")
-        result = predict_audio(temp_audio_path, file.content_type)
+        result = await audio_batcher.submit(audio_bytes, file.content_type, filename)
         
-        print(f"\n{'='*50}")
-        print(f"✓ AUDIO PREDICTION: {result['prediction']}")
-        print(f"✓ CONFIDENCE: {result['confidence']:.1f}%")
-        print(f"{'='*50}\n")
+        logger.info("Audio prediction: %s (%.1f%%)", result["prediction"], result["confidence"])
         
         return JSONResponse(content=result)
     
     except AudioValidationError as e:
-        print(f"\n❌ Audio validation error: {str(e)}")
+        logger.info("Audio validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     
     except AudioLoadError as e:
-        print(f"\n❌ Audio load error: {str(e)}")
+        logger.info("Audio load error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     
     except AudioPredictionError as e:
-        print(f"\n❌ Audio prediction error: {str(e)}")
+        logger.error("Audio prediction error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     
     except HTTPException:
         raise
     
     except Exception as e:
-        print(f"\n❌ Error during audio prediction: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error during audio prediction")
         raise HTTPException(
             status_code=500,
             detail=f"Audio prediction failed: {str(e)}"
         )
-    
-    finally:
-        # Clean up temporary file
-        if temp_audio_path and os.path.exists(temp_audio_path):
-            try:
-                os.unlink(temp_audio_path)
-                print(f"✓ Cleaned up temporary audio file")
-            except Exception as e:
-                print(f"⚠ Warning: Could not delete temporary audio file: {e}")
 
 
 @app.get("/api/models")
 async def list_available_models():
     """List all available models and their frame counts"""
-    import glob
-    models_dir = "models"
-    model_files = glob.glob(os.path.join(models_dir, "*.pt"))
-    
-    models_info = []
-    for model_path in model_files:
-        filename = os.path.basename(model_path)
-        try:
-            parts = filename.split("_")
-            accuracy = parts[1]
-            frames = parts[3]
-            models_info.append({
-                "filename": filename,
-                "frames": int(frames),
-                "accuracy": f"{accuracy}%"
-            })
-        except (IndexError, ValueError):
-            continue
+    # Same mtime-keyed scan that load_model uses to pick checkpoints
+    models_info = [
+        {
+            "filename": os.path.basename(model_path),
+            "frames": frames,
+            "accuracy": f"{accuracy:g}%"
+        }
+        for model_path, accuracy, frames in list_models(MODELS_DIR)
+    ]
     
     return {
         "available_models": sorted(models_info, key=lambda x: x["frames"]),
@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+import audio_predict
+
+
+class FakePipeline:
+    """Scores each waveform by its mean, and fails if a call mixes lengths."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def __call__(self, inputs, batch_size=None, num_workers=None):
+        lengths = {len(item["raw"]) for item in inputs}
+        assert len(lengths) == 1, "inputs of different lengths were padded together"
+        self.calls.append(len(inputs))
+        results = []
+        for item in inputs:
+            fake = float(np.clip(item["raw"].mean(), 0.0, 1.0))
+            results.append([{"label": "fake", "score": fake}, {"label": "real", "score": 1.0 - fake}])
+        return results
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    pipeline = FakePipeline()
+    monkeypatch.setattr(audio_predict, "load_audio_pipeline", lambda: pipeline)
+    monkeypatch.setattr(
+        audio_predict,
+        "preprocess_audio",
+        lambda audio, content_type=None, filename=None: {"raw": audio, "sampling_rate": 16000}
+    )
+    return pipeline
+
+
+def test_batched_results_match_single_item_results(fake_pipeline):
+    waveforms = [
+        np.full(16000, 0.2, dtype=np.float32),
+        np.full(48000, 0.7, dtype=np.float32),
+        np.full(16000, 0.9, dtype=np.float32),
+    ]
+    
+    batched = audio_predict.predict_audio_batch([(w, None, "a.wav") for w in waveforms])
+    single = [audio_predict.predict_audio_batch([(w, None, "a.wav")])[0] for w in waveforms]
+    
+    assert batched == single
+
+
+def test_only_equal_lengths_share_a_pipeline_call(fake_pipeline):
+    waveforms = [np.zeros(16000, dtype=np.float32), np.zeros(32000, dtype=np.float32), np.zeros(16000, dtype=np.float32)]
+    
+    audio_predict.predict_audio_batch([(w, None, "a.wav") for w in waveforms])
+    
+    assert sorted(fake_pipeline.calls) == [1, 2]
@@ -0,0 +1,42 @@
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("soundfile")
+pytest.importorskip("librosa")
+
+import audio_preprocessing
+
+# Start of an MP3 stream; soundfile cannot read it, ffmpeg can
+MP3_BYTES = b"ID3\x04\x00\x00\x00\x00\x00\x00" + b"\xff\xfb\x90\x64" + b"\x00" * 1024
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """Stands in for PyAV and records what it was given."""
+    seen = []
+    
+    def decode(source):
+        seen.append(source.read())
+        return np.zeros(16000, dtype=np.float32)
+    
+    monkeypatch.setattr(audio_preprocessing, "av", object())
+    monkeypatch.setattr(audio_preprocessing, "decode_with_pyav", decode)
+    return seen
+
+
+def test_mislabeled_wav_falls_back_to_ffmpeg(fake_ffmpeg):
+    samples = audio_preprocessing.decode_to_array(io.BytesIO(MP3_BYTES), "clip.wav")
+    
+    assert samples.shape == (16000,)
+    # The fallback decoder sees the whole upload, not what soundfile left behind
+    assert fake_ffmpeg == [MP3_BYTES]
+
+
+def test_nameless_upload_falls_back_to_ffmpeg(fake_ffmpeg):
+    # server.py names uploads without a filename "audio.wav"
+    result = audio_preprocessing.preprocess_audio(MP3_BYTES, "audio/mpeg", "audio.wav")
+    
+    assert result["sampling_rate"] == audio_preprocessing.REQUIRED_SAMPLE_RATE
+    assert fake_ffmpeg == [MP3_BYTES]
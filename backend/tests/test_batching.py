@@ -0,0 +1,32 @@
+import asyncio
+
+from batching import collect_batch
+
+
+def _collect(items, max_batch, max_wait):
+    async def run():
+        queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+        batch = await collect_batch(queue, max_batch, max_wait)
+        return batch, queue.qsize()
+    
+    return asyncio.run(run())
+
+
+def test_zero_wait_takes_already_queued_items():
+    assert _collect([1, 2, 3], max_batch=8, max_wait=0) == ([1, 2, 3], 0)
+
+
+def test_batch_stops_at_max_batch():
+    assert _collect([1, 2, 3], max_batch=2, max_wait=0) == ([1, 2], 1)
+
+
+def test_zero_wait_does_not_wait_for_more():
+    async def run():
+        queue = asyncio.Queue()
+        queue.put_nowait(1)
+        asyncio.get_running_loop().call_later(0.05, queue.put_nowait, 2)
+        return await collect_batch(queue, 8, 0)
+    
+    assert asyncio.run(run()) == [1]
@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("torch")
+pytest.importorskip("cv2")
+
+import preprocessing
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    """Fake detector: frames are ints, and frames in ``faces`` have a face at box (f, f, f, f)."""
+    state = {"faces": set(), "calls": []}
+    
+    def find_face_box(frame):
+        state["calls"].append(frame)
+        return (frame,) * 4 if frame in state["faces"] else None
+    
+    monkeypatch.setattr(preprocessing, "find_face_box", find_face_box)
+    return state
+
+
+def test_interval_one_detects_every_frame(detector):
+    detector["faces"] = {0, 2, 3}
+    
+    boxes, detected = preprocessing.find_face_boxes(list(range(5)), interval=1)
+    
+    assert sorted(detector["calls"]) == [0, 1, 2, 3, 4]
+    assert boxes == [(0,) * 4, None, (2,) * 4, (3,) * 4, None]
+    assert detected == [True, False, True, True, False]
+
+
+def test_frames_reuse_their_keyframe_box(detector):
+    detector["faces"] = set(range(8))
+    
+    # Keyframes 0, 3, 6; frames 6-7 are a trailing partial interval
+    boxes, detected = preprocessing.find_face_boxes(list(range(8)), interval=3)
+    
+    assert sorted(detector["calls"]) == [0, 3, 6]
+    assert boxes == [(0,) * 4] * 3 + [(3,) * 4] * 3 + [(6,) * 4] * 2
+    assert detected == [True, False, False, True, False, False, True, False]
+
+
+def test_keyframe_without_face_detects_its_interval(detector):
+    # Keyframes 3 and 6 have no face; 4 does, 5 and 7 do not
+    detector["faces"] = {0, 1, 2, 4}
+    
+    boxes, detected = preprocessing.find_face_boxes(list(range(8)), interval=3)
+    
+    assert sorted(detector["calls"]) == [0, 3, 4, 5, 6, 7]
+    assert boxes == [(0,) * 4] * 3 + [None, (4,) * 4, None, None, None]
+    assert detected == [True, False, False, False, True, False, False, False]
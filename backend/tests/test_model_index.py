@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+import model_utils
+
+
+def _add_checkpoint(models_dir, name):
+    (models_dir / name).touch()
+    # Make sure the directory mtime changes even on coarse-grained filesystems
+    stat = os.stat(models_dir)
+    os.utime(models_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_checkpoint_added_after_first_lookup_is_found(tmp_path):
+    _add_checkpoint(tmp_path, "model_90_acc_20_frames_FF_data.pt")
+    assert model_utils.get_accurate_model(60, str(tmp_path)) is None
+    
+    _add_checkpoint(tmp_path, "model_95_acc_60_frames_FF_data.pt")
+    
+    assert model_utils.get_accurate_model(60, str(tmp_path)) == str(tmp_path / "model_95_acc_60_frames_FF_data.pt")
+
+
+def test_most_accurate_checkpoint_wins(tmp_path):
+    _add_checkpoint(tmp_path, "model_90_acc_20_frames_a.pt")
+    _add_checkpoint(tmp_path, "model_97.5_acc_20_frames_b.pt")
+    _add_checkpoint(tmp_path, "notes.pt")
+    
+    assert model_utils.get_accurate_model(20, str(tmp_path)) == str(tmp_path / "model_97.5_acc_20_frames_b.pt")
+    assert len(model_utils.list_models(str(tmp_path))) == 2
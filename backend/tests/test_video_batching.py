@@ -0,0 +1,30 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+from model_utils import Model
+
+
+def test_batched_forward_matches_per_video_forward():
+    torch.manual_seed(0)
+    model = Model(num_classes=2, pretrained=False)
+    videos = torch.randn(3, 4, 3, 112, 112)
+    
+    with torch.inference_mode():
+        _, batched_logits = model(videos)
+        single_logits = torch.cat([model(video.unsqueeze(0))[1] for video in videos])
+    
+    torch.testing.assert_close(batched_logits, single_logits, rtol=1e-4, atol=1e-5)
+
+
+def test_batched_forward_does_not_depend_on_batch_order():
+    torch.manual_seed(0)
+    model = Model(num_classes=2, pretrained=False)
+    videos = torch.randn(2, 4, 3, 112, 112)
+    
+    with torch.inference_mode():
+        _, logits = model(videos)
+        _, swapped_logits = model(videos.flip(0))
+    
+    torch.testing.assert_close(logits, swapped_logits.flip(0), rtol=1e-4, atol=1e-5)
@@ -0,0 +1,104 @@
+"""
+Video Deepfake Detection - Request Batching
+
+Collects concurrent /api/predict requests that use the same sequence length
+and runs them through the model in a single forward pass, so the per-call
+Python and kernel launch overhead is shared across videos.
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Tuple
+
+import torch
+
+from batching import collect_batch
+from model_utils import load_model
+from preprocessing import predict_batch
+
+# Maximum number of videos per forward pass and how long to wait for more
+VIDEO_MAX_BATCH = int(os.getenv("VIDEO_MAX_BATCH", "4"))
+VIDEO_BATCH_WAIT = float(os.getenv("VIDEO_BATCH_WAIT_MS", "30")) / 1000
+
+
+class VideoBatcher:
+    """
+    Micro-batcher for video predictions.
+    
+    Keeps one queue per sequence length (each length uses its own model).
+    A background task per queue drains up to ``max_batch`` requests, or
+    whatever arrived within ``max_wait`` seconds, concatenates their frame
+    tensors along the batch dimension and resolves each request's future
+    with its own result.
+    """
+    
+    def __init__(self, device: str, max_batch: int = VIDEO_MAX_BATCH, max_wait: float = VIDEO_BATCH_WAIT):
+        self.device = device
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        # One CUDA stream per sequence length, so batches for different
+        # models run concurrently instead of on the default stream
+        self._streams: Dict[int, "torch.cuda.Stream"] = {}
+    
+    async def submit(self, frames_tensor: torch.Tensor, sequence_length: int) -> Tuple[int, float]:
+        """
+        Queue a preprocessed video for prediction and wait for the result.
+        
+        Args:
+            frames_tensor: Preprocessed video tensor, shape (1, seq, 3, H, W)
+            sequence_length: Number of frames (selects the model)
+        
+        Returns:
+            Tuple of (prediction, confidence), same as preprocessing.predict
+        """
+        queue = self._queues.get(sequence_length)
+        if queue is None:
+            queue = self._queues[sequence_length] = asyncio.Queue()
+            if self.device == "cuda":
+                self._streams[sequence_length] = torch.cuda.Stream()
+            self._workers[sequence_length] = asyncio.create_task(self._worker(sequence_length, queue))
+        
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((frames_tensor, future))
+        return await future
+    
+    async def _worker(self, sequence_length: int, queue: asyncio.Queue) -> None:
+        """Drain the queue for one sequence length in batches."""
+        while True:
+            batch = await collect_batch(queue, self.max_batch, self.max_wait)
+            
+            try:
+                # Run the forward pass off the event loop
+                results = await asyncio.to_thread(
+                    self._run, sequence_length, [frames_tensor for frames_tensor, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+    
+    def _run(self, sequence_length: int, tensors: List[torch.Tensor]) -> List[Tuple[int, float]]:
+        """Run one forward pass over the concatenated batch."""
+        model = load_model(sequence_length, self.device)
+        if model is None:
+            raise RuntimeError(f"Failed to load model for {sequence_length} frames")
+        
+        if len(tensors) == 1:
+            batched = tensors[0]
+        else:
+            # Concatenate into pinned memory so the GPU copy stays asynchronous
+            batched = torch.empty(
+                (sum(tensor.shape[0] for tensor in tensors),) + tuple(tensors[0].shape[1:]),
+                dtype=tensors[0].dtype,
+                pin_memory=self.device == "cuda"
+            )
+            torch.cat(tensors, dim=0, out=batched)
+        
+        return predict_batch(model, batched, self.device, stream=self._streams.get(sequence_length))
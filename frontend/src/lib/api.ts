@@ -80,7 +80,8 @@ export interface VideoPredictionResponse {
   device: string;
   faces_found: number;
   total_frames_analyzed: number;
-  frame_images: string[];  // Base64 encoded images
+  job_id: string;
+  frame_images: string[];  // Image URLs of the analyzed frames
   error?: string;
 }
 
@@ -104,8 +105,10 @@ export const predictVideo = async (
       throw new Error(errorData.error || `Server error: ${response.status}`);
     }
 
-    const data = await response.json();
-    return data as VideoPredictionResponse;
+    const data = await response.json() as VideoPredictionResponse;
+    // Frame images are served from the backend as relative paths
+    data.frame_images = data.frame_images.map((path) => `${BACKEND_URL}${path}`);
+    return data;
   } catch (error) {
     if (error instanceof Error) {
       throw error;